@@ -323,7 +323,7 @@ def exportToFile(calendars, fileobj, convertToMailto=False):
     comp = Component.newCalendar()
     for calendar in calendars:
         calendar = yield calendar
-        for obj in (yield calendar.calendarObjects()):
+        for obj in (yield calendar.calendarObjectsWithText()):
             evt = yield obj.filteredComponent(
                 calendar.ownerCalendarHome().uid(), True
             )
@@ -373,7 +373,7 @@ def exportToDirectory(collections, dirname, convertToMailto=False):
             source = "/calendars/__uids__/{}/{}/".format(homeUID, collection.name())
             comp.addProperty(Property("SOURCE", source))
 
-            for obj in (yield collection.calendarObjects()):
+            for obj in (yield collection.calendarObjectsWithText()):
                 evt = yield obj.filteredComponent(homeUID, True)
                 for sub in evt.subcomponents():
                     if sub.name() != 'VTIMEZONE':
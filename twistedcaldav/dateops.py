@@ -308,6 +308,31 @@ def parseSQLTimestampToPyCalendar(ts, withTimezone=None):
         )
 
 
+def parseSQLTimestampToDatetime(ts):
+    """
+    Parse an SQL formated timestamp into a C{datetime}. This avoids the cost of
+    C{datetime.strptime} for a value in a known fixed format.
+    @param ts: the SQL timestamp
+    @type ts: C{str} or C{datetime}
+
+    @return: C{datetime} result
+    """
+
+    if isinstance(ts, datetime):
+        return ts
+    else:
+        # Format is "%Y-%m-%d %H:%M:%S" with an optional ".%f"
+        return datetime(
+            year=int(ts[0:4]),
+            month=int(ts[5:7]),
+            day=int(ts[8:10]),
+            hour=int(ts[11:13]),
+            minute=int(ts[14:16]),
+            second=int(ts[17:19]),
+            microsecond=int(ts[20:26].ljust(6, "0")) if len(ts) > 20 else 0,
+        )
+
+
 def tupleFromDateTime(dt):
     """
     Convert a L{DateTime} into a L{tuple} of L{int}s that performs better when pickled.
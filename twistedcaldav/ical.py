@@ -1361,8 +1361,7 @@ class Component (object):
         # properly.
         instances = self.expandTimeRanges(end, lowerLimit=start, normalizeFunction=normalizeForExpand)
         first = True
-        for key in instances:
-            instance = instances[key]
+        for instance in instances.itervalues():
             if timeRangesOverlap(normalizeForIndex(instance.start), normalizeForIndex(instance.end), start, end, pytz):
                 calendar.addComponent(self.expandComponent(instance, first))
             first = False
@@ -26,6 +26,8 @@ from pycalendar.duration import Duration
 from pycalendar.period import Period
 from pycalendar.timezone import Timezone
 
+from itertools import imap
+
 
 class TooManyInstancesError(Exception):
 
@@ -115,6 +117,13 @@ class InstanceList(object):
     def __getitem__(self, key):
         return self.instances[key]
 
+    def itervalues(self):
+        # Return instances in sorted key order via iterator. Sorting just the keys and
+        # mapping them through the dict is cheaper than sorting the (key, instance)
+        # items, and avoids the per-key __getitem__ call of iterating over self.
+        instances = self.instances
+        return imap(instances.__getitem__, sorted(instances))
+
     def expandTimeRanges(self, componentSet, limit, lowerLimit=None):
         """
         Expand the set of recurrence instances up to the specified date limit.
@@ -22,6 +22,7 @@ from pycalendar.timezone import Timezone
 from twisted.trial.unittest import SkipTest
 
 from twistedcaldav.dateops import parseSQLTimestampToPyCalendar, \
+    parseSQLTimestampToDatetime, \
     parseSQLDateToPyCalendar, pyCalendarToSQLTimestamp, \
     normalizeForExpand, normalizeForIndex, normalizeToUTC, timeRangesOverlap
 from twistedcaldav.timezones import TimezoneCache
@@ -265,6 +266,20 @@ class Dateops(twistedcaldav.test.util.TestCase):
         for sqlStr, result in tests:
             self.assertEqual(parseSQLTimestampToPyCalendar(sqlStr), result)
 
+    def test_parseSQLTimestampToDatetime(self):
+        """
+        dateops.parseSQLTimestampToDatetime
+        """
+        tests = (
+            ("2012-04-04 12:34:56", datetime(2012, 4, 4, 12, 34, 56)),
+            ("2012-04-04 12:34:56.5", datetime(2012, 4, 4, 12, 34, 56, 500000)),
+            ("2012-12-31 01:01:01.123456", datetime(2012, 12, 31, 1, 1, 1, 123456)),
+            (datetime(2012, 12, 31, 1, 1, 1, 123456), datetime(2012, 12, 31, 1, 1, 1, 123456)),
+        )
+
+        for sqlStr, result in tests:
+            self.assertEqual(parseSQLTimestampToDatetime(sqlStr), result)
+
     def test_parseSQLDateToPyCalendar(self):
         """
         dateops.parseSQLDateToPyCalendar
@@ -654,6 +654,19 @@ END:VCALENDAR
             self.assertEqual(end, DateTime(2004, 11, 27))
             break
 
+    def test_component_timeranges_itervalues(self):
+        """
+        InstanceList.itervalues returns the instances in the same order as
+        iterating over the keys.
+        """
+        calendar = Component.fromStream(file(os.path.join(self.data_dir, "Holidays", "C3186426-1ED0-11D9-A5E0-000A958A3252.ics")))
+
+        instances = calendar.expandTimeRanges(DateTime(2010, 1, 1))
+        self.assertEqual(
+            list(instances.itervalues()),
+            [instances[key] for key in instances],
+        )
+
     def test_component_timezone_validate(self):
         """
         CalDAV resource validation.
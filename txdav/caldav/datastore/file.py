@@ -53,8 +53,8 @@ from txdav.caldav.icalendarstore import ICalendarHome
 from txdav.caldav.datastore.index_file import Index as OldIndex, \
     IndexSchedule as OldInboxIndex
 from txdav.caldav.datastore.util import (
-    validateCalendarComponent, dropboxIDFromCalendarObject, CalendarObjectBase,
-    StorageTransportBase, AttachmentRetrievalTransport
+    validateCalendarComponent, dropboxIDFromCalendarObject, dropboxIDFromUID,
+    CalendarObjectBase, StorageTransportBase, AttachmentRetrievalTransport
 )
 
 from txdav.common.datastore.file import (
@@ -153,10 +153,19 @@ class CalendarHome(CommonHome):
     @inlineCallbacks
     def calendarObjectWithDropboxID(self, dropboxID):
         """
-        Implement lookup with brute-force scanning.
+        Implement lookup with brute-force scanning. To avoid parsing every
+        calendar object, the UIDs cached from each calendar's index and the raw
+        (unfolded) calendar data are used to rule out objects that cannot
+        possibly have the requested dropbox ID, and only the remaining
+        candidates are checked properly.
         """
         for calendar in self.calendars():
-            for calendarObject in calendar.calendarObjects():
+            for calendarObject in calendar._index.calendarObjects():
+                if not (
+                    dropboxIDFromUID(calendarObject.uid()) == dropboxID or
+                    dropboxID in calendarObject._text().replace("\r\n ", "").replace("\r\n\t", "")
+                ):
+                    continue
                 if dropboxID == (yield calendarObject.dropboxID()):
                     returnValue(calendarObject)
 
@@ -257,6 +266,8 @@ class Calendar(CommonHomeChild):
     ownerCalendarHome = CommonHomeChild.ownerHome
     viewerCalendarHome = CommonHomeChild.viewerHome
     calendarObjects = CommonHomeChild.objectResources
+    # Data is read from each file on demand, so there is nothing to preload
+    calendarObjectsWithText = CommonHomeChild.objectResources
     listCalendarObjects = CommonHomeChild.listObjectResources
     calendarObjectWithName = CommonHomeChild.objectResourceWithName
     calendarObjectWithUID = CommonHomeChild.objectResourceWithUID
@@ -373,6 +384,7 @@ class CalendarObject(CommonObjectResource, CalendarObjectBase):
     def __init__(self, name, calendar, metadata=None):
         super(CalendarObject, self).__init__(name, calendar)
         self._attachments = {}
+        self._cachedComponent = None
 
         if metadata is not None:
             self.accessMode = metadata.get("accessMode", "")
@@ -399,6 +411,7 @@ class CalendarObject(CommonObjectResource, CalendarObjectBase):
 
         componentText = str(component)
         self._objectText = componentText
+        self._cachedComponent = component
 
         def do():
             # Mark all properties as dirty, so they can be added back
@@ -441,26 +454,29 @@ class CalendarObject(CommonObjectResource, CalendarObjectBase):
         the caller - that is not ideal but in theory we should have checked everything on the way in and
         only allowed in good data.
         """
-        text = self._text()
-        try:
-            component = VComponent.fromString(text)
-        except InvalidICalendarDataError, e:
-            # This is a really bad situation, so do raise
-            raise InternalDataStoreError(
-                "File corruption detected (%s) in file: %s"
-                % (e, self._path.path)
-            )
+        if self._cachedComponent is None:
+            text = self._text()
+            try:
+                component = VComponent.fromString(text)
+            except InvalidICalendarDataError, e:
+                # This is a really bad situation, so do raise
+                raise InternalDataStoreError(
+                    "File corruption detected (%s) in file: %s"
+                    % (e, self._path.path)
+                )
+
+            # Fix any bogus data we can
+            fixed, unfixed = component.validCalendarData(doFix=True, doRaise=False)
 
-        # Fix any bogus data we can
-        fixed, unfixed = component.validCalendarData(doFix=True, doRaise=False)
+            if unfixed:
+                self.log.error("Calendar data at {path} had unfixable problems:\n  {problems}", path=self._path.path, problems="\n  ".join(unfixed))
 
-        if unfixed:
-            self.log.error("Calendar data at {path} had unfixable problems:\n  {problems}", path=self._path.path, problems="\n  ".join(unfixed))
+            if fixed:
+                self.log.error("Calendar data at {path} had fixable problems:\n  {problems}", path=self._path.path, problems="\n  ".join(fixed))
 
-        if fixed:
-            self.log.error("Calendar data at {path} had fixable problems:\n  {problems}", path=self._path.path, problems="\n  ".join(fixed))
+            self._cachedComponent = component
 
-        return component
+        return self._cachedComponent
 
     def componentForUser(self, user_uuid=None):
         """
@@ -724,6 +740,7 @@ class AttachmentStorageTransport(StorageTransportBase):
             attachment, contentType, dispositionName)
         self._path = self._attachment._path.temporarySibling()
         self._file = self._path.open("w")
+        self._hash = hashlib.md5()
 
         self._txn.postAbort(self.aborted)
 
@@ -739,8 +756,8 @@ class AttachmentStorageTransport(StorageTransportBase):
             self._path.remove()
 
     def write(self, data):
-        # FIXME: multiple chunks
         self._file.write(data)
+        self._hash.update(data)
         return super(AttachmentStorageTransport, self).write(data)
 
     def loseConnection(self):
@@ -763,12 +780,11 @@ class AttachmentStorageTransport(StorageTransportBase):
 
         self._path.moveTo(self._attachment._path)
 
-        md5 = hashlib.md5(self._attachment._path.getContent()).hexdigest()
         props = self._attachment.properties()
         props[contentTypeKey] = GETContentType(
             generateContentType(self._contentType)
         )
-        props[md5key] = TwistedGETContentMD5.fromString(md5)
+        props[md5key] = TwistedGETContentMD5.fromString(self._hash.hexdigest())
 
         # Adjust quota
         home.adjustQuotaUsedBytes(newSize - oldSize)
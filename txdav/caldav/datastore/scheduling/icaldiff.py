@@ -842,6 +842,13 @@ class iCalDiff(object):
         @rtype: L{bool}
         """
 
+        # Quick check - when the time-range related properties of every component are
+        # textually identical there cannot be a time-range difference, so avoid the
+        # duplicate/normalize/diff of every component. This is the common case of a
+        # SUMMARY, DESCRIPTION or ATTENDEE only change.
+        if self._timeRangeFingerprint(self.oldcalendar) == self._timeRangeFingerprint(self.newcalendar):
+            return False
+
         rids, _ignore_changes = self.whatIsDifferent(timeRangeCheck=True)
         for props in rids.values():
             if not props:
@@ -853,6 +860,27 @@ class iCalDiff(object):
         else:
             return False
 
+    def _timeRangeFingerprint(self, calendar):
+        """
+        Map each component in the calendar to the sorted text of its time-range related
+        properties. Timezone definitions are included in their entirety as changes to
+        those can also shift instances.
+
+        @param calendar: the calendar to fingerprint
+        @type calendar: L{Component}
+
+        @return: mapping of component key to fingerprint
+        @rtype: C{dict}
+        """
+        fingerprint = {}
+        for component in calendar.subcomponents():
+            if component.name() == "VTIMEZONE":
+                fingerprint[(component.name(), component.propertyValue("TZID"), None,)] = str(component)
+            else:
+                key = (component.name(), component.propertyValue("UID"), component.getRecurrenceIDUTC(),)
+                fingerprint[key] = sorted([str(prop) for prop in component.properties() if prop.name() in self.TRPROPS])
+        return fingerprint
+
     def attendeeNeedsAction(self, diffs):
         """
         Given a set of results from L{whatIsDifferent}, determine which recurrence-id's
@@ -40,13 +40,14 @@ from twext.who.idirectory import RecordType
 from txweb2.http_headers import MimeType
 from txweb2.stream import readStream
 
-from twisted.internet.defer import inlineCallbacks, returnValue, succeed
+from twisted.internet.defer import inlineCallbacks, returnValue, succeed, \
+    DeferredList
 from twisted.python.failure import Failure
 
 from twistedcaldav import customxml, ical
 from twistedcaldav.stdconfig import config
 from twistedcaldav.datafilters.peruserdata import PerUserDataFilter
-from twistedcaldav.dateops import normalizeForIndex, \
+from twistedcaldav.dateops import normalizeForIndex, floatoffset, \
     pyCalendarToSQLTimestamp, parseSQLDateToPyCalendar
 from twistedcaldav.ical import Component, InvalidICalendarDataError, Property, ATTENDEE_COMMENT
 from twistedcaldav.instance import InvalidOverriddenInstanceError
@@ -122,6 +123,28 @@ import uuid
 log = Logger()
 
 
+@inlineCallbacks
+def _pipelined(deferreds):
+    """
+    Wait for a set of statements that have all been queued on the same
+    transaction. The transaction executes them in order, so queuing them all
+    before waiting avoids a round-trip per statement. Unlike
+    L{gatherResults}, the first failure (if any) is raised as-is rather than
+    wrapped in a L{FirstError}.
+
+    @param deferreds: the results of each statement's C{on(txn)}
+    @type deferreds: C{list} of L{Deferred}
+
+    @return: the result of each statement, in the same order
+    @rtype: C{list}
+    """
+    results = yield DeferredList(deferreds, consumeErrors=True)
+    for success, result in results:
+        if not success:
+            result.raiseException()
+    returnValue([result for _ignore_success, result in results])
+
+
 class CalendarStoreFeatures(object):
     """
     Manages store-wide operations specific to calendars.
@@ -246,20 +269,13 @@ class CalendarStoreFeatures(object):
         cobjs = (yield self._loadCalendarObjectsForDropboxID(txn, dropbox_id))
         log.debug("  {len} affected calendar objects", len=len(cobjs))
 
-        # Get names of each matching attachment
-        at = Attachment._attachmentSchema
-        names = (yield Select(
-            (at.PATH,),
-            From=at,
-            Where=at.DROPBOX_ID == dropbox_id,
-        ).on(txn))
-        log.debug("  {len} associated attachment objects", len=len(names))
+        # Get each matching attachment
+        attachments = (yield DropBoxAttachment.loadAll(txn, dropbox_id))
+        log.debug("  {len} associated attachment objects", len=len(attachments))
 
         # For each attachment, update each calendar object
-        for name in names:
-            name = name[0]
-            log.debug("  processing attachment object: {name}", name=name)
-            attachment = (yield DropBoxAttachment.load(txn, dropbox_id, name))
+        for attachment in attachments:
+            log.debug("  processing attachment object: {name}", name=attachment.name())
 
             # Check for orphans
             if len(cobjs) == 0:
@@ -1333,6 +1349,7 @@ class Calendar(CommonHomeChild):
     ownerCalendarHome = CommonHomeChild.ownerHome
     viewerCalendarHome = CommonHomeChild.viewerHome
     calendarObjects = CommonHomeChild.objectResources
+    calendarObjectsWithText = CommonHomeChild.objectResourcesWithText
     listCalendarObjects = CommonHomeChild.listObjectResources
     calendarObjectWithName = CommonHomeChild.objectResourceWithName
     calendarObjectWithUID = CommonHomeChild.objectResourceWithUID
@@ -1404,8 +1421,56 @@ class Calendar(CommonHomeChild):
             child = yield self.objectResourceWithID(rid)
         yield child._removeInternal(internal_state=ComponentRemoveState.INTERNAL, useTrash=False)
 
+    @classproperty
+    def _objectNamesInTimeRangeQuery(cls):  # @NoSelf
+        """
+        Query to find resources with an indexed instance overlapping a time range
+        """
+        co = cls._objectSchema
+        tr = schema.TIME_RANGE
+        return Select(
+            [co.RESOURCE_NAME],
+            From=co.join(tr, co.RESOURCE_ID == tr.CALENDAR_OBJECT_RESOURCE_ID),
+            Where=(tr.CALENDAR_RESOURCE_ID == Parameter("resourceID")).And(
+                (
+                    (tr.FLOATING == False).And(
+                        tr.START_DATE < Parameter("end")).And(
+                        tr.END_DATE > Parameter("start"))
+                ).Or(
+                    (tr.FLOATING == True).And(
+                        tr.START_DATE < Parameter("endfloat")).And(
+                        tr.END_DATE > Parameter("startfloat"))
+                )
+            ),
+            Distinct=True,
+        )
+
+    @inlineCallbacks
     def calendarObjectsInTimeRange(self, start, end, timeZone):
-        raise NotImplementedError()
+        """
+        Use the TIME_RANGE index to find the calendar objects that have instances
+        overlapping the time range. Resources whose index does not cover the
+        range are re-expanded first, as is done for an indexed L{search}.
+
+        @raise TimeRangeUpperLimit: if C{end} is beyond the maximum expansion
+        @raise TimeRangeLowerLimit: if C{start} is before the truncation limit
+        """
+        # The index holds UTC values
+        start = normalizeForIndex(start)
+        end = normalizeForIndex(end)
+
+        yield self.testAndUpdateIndexForTimeRange(start, end)
+
+        rows = yield self._objectNamesInTimeRangeQuery.on(
+            self._txn,
+            resourceID=self._resourceID,
+            start=pyCalendarToSQLTimestamp(start),
+            end=pyCalendarToSQLTimestamp(end),
+            startfloat=pyCalendarToSQLTimestamp(floatoffset(start, timeZone)),
+            endfloat=pyCalendarToSQLTimestamp(floatoffset(end, timeZone)),
+        )
+        results = yield self._objectResourceClass.loadAllObjectsWithNames(self, [row[0] for row in rows])
+        returnValue(results)
 
     def objectResourcesHaveProperties(self):
         """
@@ -1734,38 +1799,9 @@ class Calendar(CommonHomeChild):
 
         # Check for time-range re-expand
         if usedtimerange is not None:
-
-            today = DateTime.getToday()
-
-            # Determine how far we need to extend the current expansion of
-            # events. If we have an open-ended time-range we will expand
-            # one year past the start. That should catch bounded
-            # recurrences - unbounded will have been indexed with an
-            # "infinite" value always included.
             maxDate, isStartDate = filter.getmaxtimerange()
-            if maxDate:
-                maxDate = maxDate.duplicate()
-                maxDate.offsetDay(1)
-                maxDate.setDateOnly(True)
-                upperLimit = today + Duration(days=config.FreeBusyIndexExpandMaxDays)
-                if maxDate > upperLimit:
-                    raise TimeRangeUpperLimit(upperLimit)
-                if isStartDate:
-                    maxDate += Duration(days=365)
-
-            # Determine if the start date is too early for the restricted range we
-            # are applying. If it is today or later we don't need to worry about truncation
-            # in the past.
             minDate, _ignore_isEndDate = filter.getmintimerange()
-            if minDate >= today:
-                minDate = None
-            if minDate is not None and config.FreeBusyIndexLowerLimitDays:
-                truncateLowerLimit = today - Duration(days=config.FreeBusyIndexLowerLimitDays)
-                if minDate < truncateLowerLimit:
-                    raise TimeRangeLowerLimit(truncateLowerLimit)
-
-            if maxDate is not None or minDate is not None:
-                yield self.testAndUpdateIndex(minDate, maxDate)
+            yield self.testAndUpdateIndexForTimeRange(minDate, maxDate, isStartDate)
 
         rowiter = yield sql_stmt.on(self._txn, **args)
 
@@ -1882,6 +1918,55 @@ class Calendar(CommonHomeChild):
             if newTxn is not None:
                 yield newTxn.commit()
 
+    @inlineCallbacks
+    def testAndUpdateIndexForTimeRange(self, minDate, maxDate, isStartDate=False):
+        """
+        Make sure the index covers a time range that is about to be queried, re-expanding
+        any resources that need it. The range must lie within the limits the index is
+        allowed to expand to.
+
+        @param minDate: start of the time range, or C{None} if open-ended
+        @type minDate: L{DateTime}
+        @param maxDate: end of the time range, or C{None} if open-ended
+        @type maxDate: L{DateTime}
+        @param isStartDate: indicates that C{maxDate} is really the start of an
+            open-ended time range
+        @type isStartDate: C{bool}
+
+        @raise TimeRangeUpperLimit: if C{maxDate} is beyond the maximum expansion
+        @raise TimeRangeLowerLimit: if C{minDate} is before the truncation limit
+        """
+
+        today = DateTime.getToday()
+
+        # Determine how far we need to extend the current expansion of
+        # events. If we have an open-ended time-range we will expand
+        # one year past the start. That should catch bounded
+        # recurrences - unbounded will have been indexed with an
+        # "infinite" value always included.
+        if maxDate:
+            maxDate = maxDate.duplicate()
+            maxDate.offsetDay(1)
+            maxDate.setDateOnly(True)
+            upperLimit = today + Duration(days=config.FreeBusyIndexExpandMaxDays)
+            if maxDate > upperLimit:
+                raise TimeRangeUpperLimit(upperLimit)
+            if isStartDate:
+                maxDate += Duration(days=365)
+
+        # Determine if the start date is too early for the restricted range we
+        # are applying. If it is today or later we don't need to worry about truncation
+        # in the past.
+        if minDate is not None and minDate >= today:
+            minDate = None
+        if minDate is not None and config.FreeBusyIndexLowerLimitDays:
+            truncateLowerLimit = today - Duration(days=config.FreeBusyIndexLowerLimitDays)
+            if minDate < truncateLowerLimit:
+                raise TimeRangeLowerLimit(truncateLowerLimit)
+
+        if maxDate is not None or minDate is not None:
+            yield self.testAndUpdateIndex(minDate, maxDate)
+
     @inlineCallbacks
     def testAndUpdateIndex(self, minDate, maxDate):
         # Find out if the index is expanded far enough
@@ -2573,6 +2658,17 @@ accessMode_to_type = {
 }
 accesstype_to_accessMode = dict([(v, k) for k, v in accessMode_to_type.items()])
 
+# Sentinel TIME_RANGE instances: the "tomb stone" lower bound for truncated
+# expansions, and "infinity" for unbounded (or not yet expanded) recurrences.
+# These are never modified - only read when building the index rows.
+_TRUNCATED_INSTANCE_START = DateTime(1901, 1, 1, 0, 0, 0, tzid=Timezone.UTCTimezone)
+_TRUNCATED_INSTANCE_END = DateTime(1901, 1, 1, 1, 0, 0, tzid=Timezone.UTCTimezone)
+_INFINITE_INSTANCE_START = DateTime(2100, 1, 1, 0, 0, 0, tzid=Timezone.UTCTimezone)
+_INFINITE_INSTANCE_END = DateTime(2100, 1, 1, 1, 0, 0, tzid=Timezone.UTCTimezone)
+
+# RECURRANCE_MAX value used when instance indexing is deferred
+_UNINDEXED_RECURRENCE_LIMIT = DateTime(1900, 1, 1, 0, 0, 0, tzid=Timezone.UTCTimezone)
+
 
 class CalendarObject(CommonObjectResource, CalendarObjectBase):
     implements(ICalendarObject)
@@ -3882,7 +3978,9 @@ class CalendarObject(CommonObjectResource, CalendarObjectBase):
                 # When there is one instance - index it.
                 expand = DateTime(2100, 1, 1, 0, 0, 0, tzid=Timezone.UTCTimezone)
                 doInstanceIndexing = True
+                recurringUnbounded = False
             else:
+                recurringUnbounded = component.isRecurringUnbounded()
 
                 # If migrating or re-creating or config option for delayed indexing is off, always index
                 if reCreate or txn._migrating or (not config.FreeBusyIndexDelayedExpand and not isInboxItem):
@@ -3892,7 +3990,8 @@ class CalendarObject(CommonObjectResource, CalendarObjectBase):
                 # by default.  This is a caching parameter which affects the size of the index;
                 # it does not affect search results beyond this period, but it may affect
                 # performance of such a search.
-                expand = (DateTime.getToday() +
+                today = DateTime.getToday()
+                expand = (today +
                           Duration(days=config.FreeBusyIndexExpandAheadDays))
 
                 if expand_until and expand_until > expand:
@@ -3910,7 +4009,7 @@ class CalendarObject(CommonObjectResource, CalendarObjectBase):
                 # occurrences into some obscenely far-in-the-future date, so we cap the caching
                 # period.  Searches beyond this period will always be relatively expensive for
                 # resources with occurrences beyond this period.
-                if expand > (DateTime.getToday() +
+                if expand > (today +
                              Duration(days=config.FreeBusyIndexExpandMaxDays)):
                     raise IndexedSearchException
 
@@ -3921,9 +4020,11 @@ class CalendarObject(CommonObjectResource, CalendarObjectBase):
                 truncateLowerLimit = None
 
             # Always do recurrence expansion even if we do not intend to index - we need this to double-check the
-            # validity of the iCalendar recurrence data.
+            # validity of the iCalendar recurrence data. When migrating, invalid overrides have already been
+            # repaired (or will be ignored) so there is no point expanding once to find them and then again
+            # to ignore them.
             try:
-                instances = component.expandTimeRanges(expand, lowerLimit=truncateLowerLimit, ignoreInvalidInstances=reCreate)
+                instances = component.expandTimeRanges(expand, lowerLimit=truncateLowerLimit, ignoreInvalidInstances=reCreate or txn._migrating)
                 recurrenceLimit = instances.limit
                 recurrenceLowerLimit = instances.lowerLimit
             except InvalidOverriddenInstanceError, e:
@@ -3931,20 +4032,17 @@ class CalendarObject(CommonObjectResource, CalendarObjectBase):
                     "Invalid instance {rid} when indexing {name} in {cal!r}",
                     rid=e.rid, name=self._name, cal=self._calendar,
                 )
-
-                if txn._migrating:
-                    # TODO: fix the data here by re-writing component then re-index
-                    instances = component.expandTimeRanges(expand, lowerLimit=truncateLowerLimit, ignoreInvalidInstances=True)
-                    recurrenceLimit = instances.limit
-                    recurrenceLowerLimit = instances.lowerLimit
-                else:
-                    raise
+                raise
 
             # Now coerce indexing to off if needed
             if not doInstanceIndexing:
                 # instances = None # used by removeOldEventGroupLink() call at end
                 recurrenceLowerLimit = None
-                recurrenceLimit = DateTime(1900, 1, 1, 0, 0, 0, tzid=Timezone.UTCTimezone)
+                recurrenceLimit = _UNINDEXED_RECURRENCE_LIMIT
+
+            # Normalized recurrence range values for the CALENDAR_OBJECT table
+            recurrenceMin = pyCalendarToSQLTimestamp(normalizeForIndex(recurrenceLowerLimit)) if recurrenceLowerLimit else None
+            recurrenceMax = pyCalendarToSQLTimestamp(normalizeForIndex(recurrenceLimit)) if recurrenceLimit else None
 
         co = self._objectSchema
         tr = schema.TIME_RANGE
@@ -4006,8 +4104,8 @@ class CalendarObject(CommonObjectResource, CalendarObjectBase):
 
             # Only needed if indexing being changed
             if instanceIndexingRequired:
-                values[co.RECURRANCE_MIN] = pyCalendarToSQLTimestamp(normalizeForIndex(recurrenceLowerLimit)) if recurrenceLowerLimit else None
-                values[co.RECURRANCE_MAX] = pyCalendarToSQLTimestamp(normalizeForIndex(recurrenceLimit)) if recurrenceLimit else None
+                values[co.RECURRANCE_MIN] = recurrenceMin
+                values[co.RECURRANCE_MAX] = recurrenceMax
 
             if inserting:
                 self._resourceID, self._created, self._modified = (
@@ -4037,31 +4135,32 @@ class CalendarObject(CommonObjectResource, CalendarObjectBase):
                         Where=tr.CALENDAR_OBJECT_RESOURCE_ID == self._resourceID
                     ).on(txn)
         else:
-            # Keep MODIFIED the same when doing an index-only update
-            values = {
-                co.RECURRANCE_MIN: pyCalendarToSQLTimestamp(normalizeForIndex(recurrenceLowerLimit)) if recurrenceLowerLimit else None,
-                co.RECURRANCE_MAX: pyCalendarToSQLTimestamp(normalizeForIndex(recurrenceLimit)) if recurrenceLimit else None,
-                co.MODIFIED: self._modified,
-            }
-
-            yield Update(
-                values,
-                Where=co.RESOURCE_ID == self._resourceID
-            ).on(txn)
-
-            # Need to wipe the existing time-range for this and rebuild
-            yield Delete(
-                From=tr,
-                Where=tr.CALENDAR_OBJECT_RESOURCE_ID == self._resourceID
-            ).on(txn)
+            # Index-only update: the calendar data is unchanged so there is no need to
+            # serialize it or re-write it. MODIFIED is only ever set explicitly, so
+            # leaving it out of the update keeps it the same. The existing time-range
+            # for this must be wiped to rebuild it - neither statement depends on the
+            # other so both are issued together.
+            yield _pipelined([
+                Update(
+                    {
+                        co.RECURRANCE_MIN: recurrenceMin,
+                        co.RECURRANCE_MAX: recurrenceMax,
+                    },
+                    Where=co.RESOURCE_ID == self._resourceID
+                ).on(txn),
+                Delete(
+                    From=tr,
+                    Where=tr.CALENDAR_OBJECT_RESOURCE_ID == self._resourceID
+                ).on(txn),
+            ])
 
         if instanceIndexingRequired and doInstanceIndexing:
-            yield self._addInstances(component, instances, truncateLowerLimit, isInboxItem, txn)
+            yield self._addInstances(component, instances, truncateLowerLimit, recurringUnbounded, isInboxItem, txn)
 
         yield self.removeOldEventGroupLink(component, instances, inserting, txn)
 
     @inlineCallbacks
-    def _addInstances(self, component, instances, truncateLowerLimit, isInboxItem, txn):
+    def _addInstances(self, component, instances, truncateLowerLimit, recurringUnbounded, isInboxItem, txn):
         """
         Add the set of supplied instances to the store.
 
@@ -4071,84 +4170,165 @@ class CalendarObject(CommonObjectResource, CalendarObjectBase):
         @type instances: L{InstanceList}
         @param truncateLowerLimit: the lower limit for instances
         @type truncateLowerLimit: L{DateTime}
+        @param recurringUnbounded: indicates if the component has an unbounded recurrence
+        @type recurringUnbounded: C{bool}
         @param isInboxItem: indicates if an inbox item
         @type isInboxItem: C{bool}
         @param txn: transaction to use
         @type txn: L{Transaction}
         """
 
-        # TIME_RANGE table update
+        # TIME_RANGE table update - collect the details for every instance first so
+        # that all the inserts can be issued together
+        details = []
+        addDetail = details.append
         lowerLimitApplied = False
-        for key in instances:
-            instance = instances[key]
+
+        # Transparency and free-busy type only depend on the component an instance
+        # comes from, and all the expanded instances of a recurrence share the master
+        # component, so only work those out once per component. Components are keyed
+        # by identity because Component.__hash__ serializes the component.
+        componentDetails = {}
+        for instance in instances.itervalues():
             start = instance.start
             end = instance.end
-            floating = instance.start.floating()
-            transp = instance.component.adjustedTransp() == "TRANSPARENT"
-            fbtype = instance.component.getFBType()
-            start.setTimezoneUTC(True)
-            end.setTimezoneUTC(True)
+            floating = start.floating()
+            instanceComponent = instance.component
+            try:
+                transp, fbtype = componentDetails[id(instanceComponent)]
+            except KeyError:
+                transp, fbtype = componentDetails[id(instanceComponent)] = (
+                    instanceComponent.adjustedTransp() == "TRANSPARENT",
+                    instanceComponent.getFBType(),
+                )
+
+            # Instances are already normalized, so only floating values need to
+            # be coerced to UTC - and re-setting UTC would discard cached state
+            if not start.utc():
+                start.setTimezoneUTC(True)
+            if not end.utc():
+                end.setTimezoneUTC(True)
 
             # Ignore if below the lower limit
             if truncateLowerLimit and end < truncateLowerLimit:
                 lowerLimitApplied = True
                 continue
 
-            yield self._addInstanceDetails(component, instance.rid, start, end, floating, transp, fbtype, isInboxItem, txn)
+            addDetail((instance.rid, start, end, floating, transp, fbtype,))
 
         # For truncated items we insert a tomb stone lower bound so that a time-range
         # query with just an end bound will match
         if lowerLimitApplied or instances.lowerLimit and len(instances.instances) == 0:
-            start = DateTime(1901, 1, 1, 0, 0, 0, tzid=Timezone.UTCTimezone)
-            end = DateTime(1901, 1, 1, 1, 0, 0, tzid=Timezone.UTCTimezone)
-            yield self._addInstanceDetails(component, None, start, end, False, True, "UNKNOWN", isInboxItem, txn)
+            details.append((None, _TRUNCATED_INSTANCE_START, _TRUNCATED_INSTANCE_END, False, True, "UNKNOWN",))
 
         # Special - for unbounded recurrence we insert a value for "infinity"
         # that will allow an open-ended time-range to always match it.
         # We also need to add the "infinity" value if the event was bounded but
         # starts after the future expansion cut-off limit.
-        if component.isRecurringUnbounded() or instances.limit and len(instances.instances) == 0:
-            start = DateTime(2100, 1, 1, 0, 0, 0, tzid=Timezone.UTCTimezone)
-            end = DateTime(2100, 1, 1, 1, 0, 0, tzid=Timezone.UTCTimezone)
-            yield self._addInstanceDetails(component, None, start, end, False, True, "UNKNOWN", isInboxItem, txn)
+        if recurringUnbounded or instances.limit and len(instances.instances) == 0:
+            details.append((None, _INFINITE_INSTANCE_START, _INFINITE_INSTANCE_END, False, True, "UNKNOWN",))
 
-    @inlineCallbacks
-    def _addInstanceDetails(self, component, rid, start, end, floating, transp, fbtype, isInboxItem, txn):
+        yield self._addInstanceDetails(component, details, isInboxItem, txn)
 
+    @classproperty
+    def _insertTimeRangeQuery(cls):  # @NoSelf
+        """
+        DAL query to insert a TIME_RANGE row for one instance.
+        """
         tr = schema.TIME_RANGE
+        return Insert({
+            tr.CALENDAR_RESOURCE_ID: Parameter("calendarResourceID"),
+            tr.CALENDAR_OBJECT_RESOURCE_ID: Parameter("resourceID"),
+            tr.FLOATING: Parameter("floating"),
+            tr.START_DATE: Parameter("startDate"),
+            tr.END_DATE: Parameter("endDate"),
+            tr.FBTYPE: Parameter("fbtype"),
+            tr.TRANSPARENT: Parameter("transparent"),
+        }, Return=tr.INSTANCE_ID)
+
+    @classproperty
+    def _insertPerUserQuery(cls):  # @NoSelf
+        """
+        DAL query to insert a PERUSER row for one instance.
+        """
         tpy = schema.PERUSER
+        return Insert({
+            tpy.TIME_RANGE_INSTANCE_ID: Parameter("instanceID"),
+            tpy.USER_ID: Parameter("userID"),
+            tpy.TRANSPARENT: Parameter("transparent"),
+            tpy.ADJUSTED_START_DATE: Parameter("adjustedStartDate"),
+            tpy.ADJUSTED_END_DATE: Parameter("adjustedEndDate"),
+        })
+
+    @inlineCallbacks
+    def _addInstanceDetails(self, component, details, isInboxItem, txn):
+        """
+        Insert the TIME_RANGE and PERUSER rows for a set of instances. Rather than
+        waiting on each insert in turn, all the TIME_RANGE inserts are queued on the
+        transaction in one go, and then all the PERUSER inserts that depend on the
+        returned instance ids are queued in one go, so the number of round-trips
+        through the transaction is constant rather than proportional to the number
+        of instances.
 
-        instanceid = (yield Insert({
-            tr.CALENDAR_RESOURCE_ID: self._calendar._resourceID,
-            tr.CALENDAR_OBJECT_RESOURCE_ID: self._resourceID,
-            tr.FLOATING: floating,
-            tr.START_DATE: pyCalendarToSQLTimestamp(start),
-            tr.END_DATE: pyCalendarToSQLTimestamp(end),
-            tr.FBTYPE: icalfbtype_to_indexfbtype.get(fbtype, icalfbtype_to_indexfbtype["FREE"]),
-            tr.TRANSPARENT: transp,
-        }, Return=tr.INSTANCE_ID).on(txn))[0][0]
+        @param component: the component whose instances are being added
+        @type component: L{Component}
+        @param details: tuples of (rid, start, end, floating, transp, fbtype) for
+            each instance
+        @type details: C{list}
+        @param isInboxItem: indicates if an inbox item
+        @type isInboxItem: C{bool}
+        @param txn: transaction to use
+        @type txn: L{Transaction}
+        """
+
+        # Bind everything that is constant across the rows once, outside the loop
+        insertTimeRange = self._insertTimeRangeQuery.on
+        calendarResourceID = self._calendar._resourceID
+        resourceID = self._resourceID
+        fbtypes = icalfbtype_to_indexfbtype
+        freeFBType = icalfbtype_to_indexfbtype["FREE"]
+        results = yield _pipelined([
+            insertTimeRange(
+                txn,
+                calendarResourceID=calendarResourceID,
+                resourceID=resourceID,
+                floating=floating,
+                startDate=pyCalendarToSQLTimestamp(start),
+                endDate=pyCalendarToSQLTimestamp(end),
+                fbtype=fbtypes.get(fbtype, freeFBType),
+                transparent=transp,
+            )
+            for _ignore_rid, start, end, floating, transp, fbtype in details
+        ])
 
         # Don't do transparency for inbox items - we never do freebusy on inbox
-        if not isInboxItem:
-            peruserdata = component.perUserData(rid)
-            for useruid, (usertransp, adjusted_start, adjusted_end) in peruserdata:
-
-                def _adjustDateTime(dt, adjustment, add_duration):
-                    if isinstance(adjustment, Duration):
-                        return pyCalendarToSQLTimestamp((dt + adjustment) if add_duration else (dt - adjustment))
-                    elif isinstance(adjustment, DateTime):
-                        return pyCalendarToSQLTimestamp(normalizeForIndex(adjustment))
-                    else:
-                        return None
+        if isInboxItem:
+            return
+
+        def _adjustDateTime(dt, adjustment, add_duration):
+            if isinstance(adjustment, Duration):
+                return pyCalendarToSQLTimestamp((dt + adjustment) if add_duration else (dt - adjustment))
+            elif isinstance(adjustment, DateTime):
+                return pyCalendarToSQLTimestamp(normalizeForIndex(adjustment))
+            else:
+                return None
 
+        insertPerUser = self._insertPerUserQuery.on
+        peruser = []
+        for (rid, start, end, _ignore_floating, transp, _ignore_fbtype), rows in zip(details, results):
+            instanceid = rows[0][0]
+            for useruid, (usertransp, adjusted_start, adjusted_end) in component.perUserData(rid):
                 if usertransp != transp or adjusted_start is not None or adjusted_end is not None:
-                    (yield Insert({
-                        tpy.TIME_RANGE_INSTANCE_ID: instanceid,
-                        tpy.USER_ID: useruid if useruid else ".",
-                        tpy.TRANSPARENT: usertransp,
-                        tpy.ADJUSTED_START_DATE: _adjustDateTime(start, adjusted_start, add_duration=False),
-                        tpy.ADJUSTED_END_DATE: _adjustDateTime(end, adjusted_end, add_duration=True),
-                    }).on(txn))
+                    peruser.append(insertPerUser(
+                        txn,
+                        instanceID=instanceid,
+                        userID=useruid if useruid else ".",
+                        transparent=usertransp,
+                        adjustedStartDate=_adjustDateTime(start, adjusted_start, add_duration=False),
+                        adjustedEndDate=_adjustDateTime(end, adjusted_end, add_duration=True),
+                    ))
+
+        yield _pipelined(peruser)
 
     @inlineCallbacks
     def copyMetadata(self, other):
@@ -5031,25 +5211,11 @@ class CalendarObject(CommonObjectResource, CalendarObjectBase):
 
     dropboxID = dropboxIDFromCalendarObject
 
-    _attachmentsQuery = Select(
-        [schema.ATTACHMENT.PATH],
-        From=schema.ATTACHMENT,
-        Where=schema.ATTACHMENT.DROPBOX_ID == Parameter('dropboxID')
-    )
-
-    @inlineCallbacks
     def attachments(self):
         if self._dropboxID:
-            rows = yield self._attachmentsQuery.on(
-                self._txn,
-                dropboxID=self._dropboxID,
-            )
-            result = []
-            for row in rows:
-                result.append((yield self.attachmentWithName(row[0])))
-            returnValue(result)
+            return DropBoxAttachment.loadAll(self._txn, self._dropboxID)
         else:
-            returnValue(())
+            return succeed(())
 
     def initPropertyStore(self, props):
         # Setup peruser special properties - these are hard-coded for now as clients are not expected
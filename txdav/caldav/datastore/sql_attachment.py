@@ -19,13 +19,12 @@ from pycalendar.value import Value
 
 from twext.enterprise.dal.syntax import Select, Insert, Delete, Parameter, \
     Update, utcNowSQL
-from twext.enterprise.util import parseSQLTimestamp
 from twext.python.filepath import CachingFilePath
 
 from twisted.internet.defer import inlineCallbacks, returnValue
 
 from twistedcaldav.config import config
-from twistedcaldav.dateops import datetimeMktime
+from twistedcaldav.dateops import datetimeMktime, parseSQLTimestampToDatetime
 from twistedcaldav.ical import Property
 
 from txdav.caldav.datastore.util import StorageTransportBase, \
@@ -39,6 +38,7 @@ from txweb2.http_headers import MimeType, generateContentType
 
 from zope.interface.declarations import implements
 
+import errno
 import hashlib
 import itertools
 import os
@@ -55,6 +55,11 @@ class AttachmentStorageTransport(StorageTransportBase):
 
     _TEMPORARY_UPLOADS_DIRECTORY = "Temporary"
 
+    # Incoming data is coalesced into chunks of at least this size before being
+    # written to the temporary file and hashed, as uploads typically arrive in
+    # many small writes
+    _WRITE_CHUNK_SIZE = 64 * 1024
+
     def __init__(self, attachment, contentType, dispositionName, creating=False, migrating=False):
         super(AttachmentStorageTransport, self).__init__(
             attachment, contentType, dispositionName)
@@ -64,6 +69,8 @@ class AttachmentStorageTransport(StorageTransportBase):
         self._file = os.fdopen(fileDescriptor, "w")
         self._path = CachingFilePath(fileName)
         self._hash = hashlib.md5()
+        self._pending = []
+        self._pendingSize = 0
         self._creating = creating
         self._migrating = migrating
 
@@ -96,8 +103,21 @@ class AttachmentStorageTransport(StorageTransportBase):
     def write(self, data):
         if isinstance(data, buffer):
             data = str(data)
-        self._file.write(data)
-        self._hash.update(data)
+        self._pending.append(data)
+        self._pendingSize += len(data)
+        if self._pendingSize >= self._WRITE_CHUNK_SIZE:
+            self._flush()
+
+    def _flush(self):
+        """
+        Write out and hash any data buffered by L{write}.
+        """
+        if self._pending:
+            data = "".join(self._pending)
+            self._file.write(data)
+            self._hash.update(data)
+            self._pending = []
+            self._pendingSize = 0
 
     @inlineCallbacks
     def loseConnection(self):
@@ -117,6 +137,7 @@ class AttachmentStorageTransport(StorageTransportBase):
         home = (yield self._txn.calendarHomeWithResourceID(self._attachment._ownerHomeID))
 
         oldSize = self._attachment.size()
+        self._flush()
         newSize = self._file.tell()
         self._file.close()
 
@@ -286,8 +307,8 @@ class Attachment(object):
 
         for attr, value in zip(child._rowAttributes(), attachmentData):
             setattr(child, attr, value)
-        child._created = parseSQLTimestamp(child._created)
-        child._modified = parseSQLTimestamp(child._modified)
+        child._created = parseSQLTimestampToDatetime(child._created)
+        child._modified = parseSQLTimestampToDatetime(child._modified)
         child._contentType = MimeType.fromString(child._contentType)
 
         return child
@@ -419,6 +440,17 @@ class Attachment(object):
     def _attachmentPathRoot(self):
         return self._txn._store.attachmentsPath
 
+    def _makeParentPaths(self):
+        """
+        Make sure the parent directory of the attachment file exists. It is OK for the
+        directory to already exist, but any other failure is raised.
+        """
+        try:
+            self._path.parent().makedirs()
+        except OSError, e:
+            if e.errno != errno.EEXIST:
+                raise
+
     @inlineCallbacks
     def initFromStore(self):
         """
@@ -443,8 +475,8 @@ class Attachment(object):
 
         for attr, value in zip(self._rowAttributes(), rows[0]):
             setattr(self, attr, value)
-        self._created = parseSQLTimestamp(self._created)
-        self._modified = parseSQLTimestamp(self._modified)
+        self._created = parseSQLTimestampToDatetime(self._created)
+        self._modified = parseSQLTimestampToDatetime(self._modified)
         self._contentType = MimeType.fromString(self._contentType)
 
         returnValue(self)
@@ -635,18 +667,15 @@ class DropBoxAttachment(Attachment):
 
         row_iter = iter(rows[0])
         a_id = row_iter.next()
-        created = parseSQLTimestamp(row_iter.next())
-        modified = parseSQLTimestamp(row_iter.next())
+        created = parseSQLTimestampToDatetime(row_iter.next())
+        modified = parseSQLTimestampToDatetime(row_iter.next())
 
         attachment = cls(txn, a_id, dropboxID, name, ownerHomeID, True)
         attachment._created = created
         attachment._modified = modified
 
         # File system paths need to exist
-        try:
-            attachment._path.parent().makedirs()
-        except:
-            pass
+        attachment._makeParentPaths()
 
         returnValue(attachment)
 
@@ -657,6 +686,21 @@ class DropBoxAttachment(Attachment):
         attachment = (yield attachment.initFromStore())
         returnValue(attachment)
 
+    @classmethod
+    @inlineCallbacks
+    def loadAll(cls, txn, dropboxID):
+        """
+        Load all the attachments with the specified dropbox ID, using a single query rather
+        than one L{load} per attachment.
+        """
+        att = cls._attachmentSchema
+        rows = (yield Select(
+            cls._allColumns(),
+            From=att,
+            Where=(att.DROPBOX_ID == dropboxID)
+        ).on(txn))
+        returnValue([cls.makeClass(txn, row) for row in rows])
+
     @property
     def _path(self):
         # Use directory hashing scheme based on MD5 of dropboxID
@@ -681,16 +725,8 @@ class DropBoxAttachment(Attachment):
         ).on(txn))
 
         if not rows:
-            # Find each attachment with matching dropbox ID
-            att = cls._attachmentSchema
-            rows = (yield Select(
-                [att.PATH],
-                From=att,
-                Where=(att.DROPBOX_ID == dropboxID)
-            ).on(txn))
-            for name in rows:
-                name = name[0]
-                attachment = yield cls.load(txn, dropboxID, name)
+            # Remove each attachment with matching dropbox ID
+            for attachment in (yield cls.loadAll(txn, dropboxID)):
                 yield attachment.remove()
 
     @inlineCallbacks
@@ -705,7 +741,7 @@ class DropBoxAttachment(Attachment):
 
         att = self._attachmentSchema
         self._created, self._modified = map(
-            parseSQLTimestamp,
+            parseSQLTimestampToDatetime,
             (yield Update(
                 {
                     att.CONTENT_TYPE: generateContentType(self._contentType),
@@ -743,12 +779,7 @@ class DropBoxAttachment(Attachment):
             raise AttachmentMigrationFailed
 
         # Then move the file on disk from the old path to the new one
-        try:
-            mattach._path.parent().makedirs()
-        except Exception:
-            # OK to fail if it already exists, otherwise must raise
-            if not mattach._path.parent().exists():
-                raise
+        mattach._makeParentPaths()
         oldpath = self._path
         newpath = mattach._path
         oldpath.moveTo(newpath)
@@ -794,8 +825,8 @@ class ManagedAttachment(Attachment):
 
         row_iter = iter(rows[0])
         a_id = row_iter.next()
-        created = parseSQLTimestamp(row_iter.next())
-        modified = parseSQLTimestamp(row_iter.next())
+        created = parseSQLTimestampToDatetime(row_iter.next())
+        modified = parseSQLTimestampToDatetime(row_iter.next())
 
         attachment = cls(txn, a_id, ".", None, ownerHomeID, True)
         attachment._managedID = managedID
@@ -803,10 +834,7 @@ class ManagedAttachment(Attachment):
         attachment._modified = modified
 
         # File system paths need to exist
-        try:
-            attachment._path.parent().makedirs()
-        except:
-            pass
+        attachment._makeParentPaths()
 
         returnValue(attachment)
 
@@ -1055,7 +1083,7 @@ class ManagedAttachment(Attachment):
         self._size = size
         att = self._attachmentSchema
         self._created, self._modified = map(
-            parseSQLTimestamp,
+            parseSQLTimestampToDatetime,
             (yield Update(
                 {
                     att.CONTENT_TYPE: generateContentType(self._contentType),
@@ -39,6 +39,7 @@ from txdav.common.datastore.sql_tables import schema
 from txdav.common.datastore.test.util import CommonCommonTests, \
     populateCalendarsFrom, deriveQuota, withSpecialQuota
 
+import errno
 import hashlib
 import os
 
@@ -273,6 +274,40 @@ END:VCALENDAR
                 "new.attachment")
         self.assertTrue(attachmentPath.isfile())
 
+    @inlineCallbacks
+    def test_attachmentPathRemoved(self):
+        """
+        Creating an attachment works when the dropbox directory made for an earlier
+        attachment in the same transaction has since been removed (as happens when
+        another transaction removes its last attachment from that directory).
+        """
+        obj = yield self.calendarObjectUnderTest()
+        att1 = yield self.stringToAttachment(obj, "sample1.attachment", "test data 1")
+        parent = att1._path.parent()
+        self.assertTrue(parent.isdir())
+        parent.remove()
+        self.assertFalse(parent.exists())
+
+        att2 = yield self.stringToAttachment(obj, "sample2.attachment", "test data 2")
+        self.assertEqual(att2._path.parent().path, parent.path)
+        self.assertEquals((yield self.attachmentToString(att2)), "test data 2")
+
+    @inlineCallbacks
+    def test_attachmentPathError(self):
+        """
+        A failure to create an attachment directory, other than the directory already
+        existing, is raised.
+        """
+        obj = yield self.calendarObjectUnderTest()
+        attachment = yield self.stringToAttachment(obj, "sample.attachment", "test data")
+
+        def _makedirs(filepath):
+            raise OSError(errno.EACCES, os.strerror(errno.EACCES))
+        self.patch(attachment._path.parent().__class__, "makedirs", _makedirs)
+
+        error = self.assertRaises(OSError, attachment._makeParentPaths)
+        self.assertEqual(error.errno, errno.EACCES)
+
     @inlineCallbacks
     def test_dropboxID(self):
         """
@@ -196,6 +196,89 @@ class CalendarHomeTest(unittest.TestCase):
         )
 
 
+    dropboxEventText = """BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//CALENDARSERVER.ORG//NONSGML Version 1//EN
+BEGIN:VEVENT
+UID:%(uid)s
+DTSTART:20080601T120000Z
+DTEND:20080601T130000Z
+DTSTAMP:20080601T120000Z
+%(property)s
+SUMMARY:%(uid)s
+END:VEVENT
+END:VCALENDAR
+"""
+
+    @inlineCallbacks
+    def _createDropboxEvents(self, events):
+        """
+        Create calendar objects in calendar_1 of home1 and commit them. The stored
+        data is then replaced with the original text, so that line folding not
+        generated by the store itself is preserved.
+
+        @param events: tuples of (name, uid, property) where property is the raw
+            (possibly folded) text of an extra property line
+        @type events: C{tuple}
+        """
+        calendar = yield self.home1.calendarWithName("calendar_1")
+        texts = {}
+        for name, uid, property in events:
+            texts[name] = (self.dropboxEventText % {"uid": uid, "property": property}).replace("\n", "\r\n")
+            calendar.createCalendarObjectWithName(name, VComponent.fromString(texts[name]))
+        yield self.txn.commit()
+        for name, text in texts.items():
+            calendar._path.child(name).setContent(text)
+        self.txn = self.calendarStore.newTransaction()
+        self.home1 = yield self.txn.calendarHomeWithUID("home1")
+
+    @inlineCallbacks
+    def test_calendarObjectWithDropboxID_folded(self):
+        """
+        L{CalendarHome.calendarObjectWithDropboxID} finds an object whose dropbox
+        ID comes from a tab-folded X-APPLE-DROPBOX property and differs from the
+        one derived from its UID.
+        """
+        yield self._createDropboxEvents((
+            (
+                "dropbox.ics",
+                "dropbox-uid",
+                "X-APPLE-DROPBOX:/calendars/__uids__/home1/dropbox/folded-drop\n\tbox-id",
+            ),
+        ))
+        calendarObject = yield self.home1.calendarObjectWithDropboxID("folded-dropbox-id")
+        self.assertNotEqual(calendarObject, None)
+        self.assertEqual(calendarObject.name(), "dropbox.ics")
+
+    @inlineCallbacks
+    def test_calendarObjectWithDropboxID_attach(self):
+        """
+        L{CalendarHome.calendarObjectWithDropboxID} finds an object whose dropbox
+        ID comes from an ATTACH property, and skips unrelated objects.
+        """
+        yield self._createDropboxEvents((
+            (
+                "unrelated.ics",
+                "unrelated-uid",
+                "X-APPLE-DROPBOX:/calendars/__uids__/home1/dropbox/unrelated.dropbox",
+            ),
+            (
+                "attach.ics",
+                "attach-uid",
+                "ATTACH:http://example.com/calendars/__uids__/home1/dropbox/attach.dropbox/file.txt",
+            ),
+        ))
+        calendarObject = yield self.home1.calendarObjectWithDropboxID("attach.dropbox")
+        self.assertNotEqual(calendarObject, None)
+        self.assertEqual(calendarObject.name(), "attach.ics")
+
+        calendarObject = yield self.home1.calendarObjectWithDropboxID("unrelated.dropbox")
+        self.assertEqual(calendarObject.name(), "unrelated.ics")
+
+        calendarObject = yield self.home1.calendarObjectWithDropboxID("missing.dropbox")
+        self.assertEqual(calendarObject, None)
+
+
 class CalendarTest(unittest.TestCase):
 
     notifierFactory = None
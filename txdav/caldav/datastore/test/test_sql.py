@@ -65,7 +65,7 @@ from txdav.common.datastore.test.util import populateCalendarsFrom, \
     CommonCommonTests, updateToCurrentYear
 from txdav.caldav.datastore.util import _migrateCalendar, migrateHome
 from txdav.caldav.icalendarstore import ComponentUpdateState, InvalidDefaultCalendar, \
-    InvalidSplit, UnknownTimezone
+    InvalidSplit, UnknownTimezone, TimeRangeUpperLimit, TimeRangeLowerLimit
 from txdav.common.icommondatastore import NoSuchObjectResourceError, \
     InvalidComponentForStoreError
 from txdav.idav import ChangeCategory
@@ -1040,6 +1040,24 @@ END:VCALENDAR
         self.assertTrue(sharedCalendar is not None)
         self.assertEqual(sharedCalendar._resourceID, newcalendar._resourceID)
 
+    @inlineCallbacks
+    def test_calendarObjectsWithText(self):
+        """
+        Test Calendar.calendarObjectsWithText loads the text data of every calendar
+        object up front.
+        """
+
+        calendar = yield self.calendarUnderTest()
+        children = yield calendar.calendarObjectsWithText()
+        self.assertNotEqual(len(children), 0)
+        for child in children:
+            text = child._textData
+            self.assertNotEqual(text, None)
+
+            # Must match what is loaded for the individual object
+            child._textData = None
+            self.assertEqual((yield child._text()), text)
+
     @inlineCallbacks
     def test_moveCalendarObjectResource(self):
         """
@@ -1396,6 +1414,94 @@ END:VCALENDAR
         self.assertEqual(rMin, None)
         self.assertEqual(rMax, None)
 
+    @inlineCallbacks
+    def test_calendarObjectsInTimeRange(self):
+        """
+        Test Calendar.calendarObjectsInTimeRange returns only the calendar objects
+        with instances in the time range.
+        """
+
+        self.patch(config, "FreeBusyIndexDelayedExpand", False)
+
+        home = yield self.homeUnderTest()
+        newcalendar = yield home.createCalendarWithName("timerange_testing")
+
+        nowYear = self.nowYear["now"]
+        caldata = """BEGIN:VCALENDAR
+VERSION:2.0
+CALSCALE:GREGORIAN
+PRODID:-//CALENDARSERVER.ORG//NONSGML Version 1//EN
+BEGIN:VEVENT
+UID:%(uid)s
+DTSTART:%(year)04d0102T140000Z
+DURATION:PT1H
+CREATED:20060102T190000Z
+DTSTAMP:20051222T210507Z
+SUMMARY:%(uid)s
+END:VEVENT
+END:VCALENDAR
+"""
+        for uid, year in (("this-year", nowYear), ("next-year", nowYear + 1),):
+            component = Component.fromString(caldata.replace("\n", "\r\n") % {"uid": uid, "year": year})
+            yield newcalendar.createCalendarObjectWithName("%s.ics" % (uid,), component)
+
+        testMin = DateTime(nowYear, 1, 1, 0, 0, 0, tzid=Timezone.UTCTimezone)
+        testMax = DateTime(nowYear, 2, 1, 0, 0, 0, tzid=Timezone.UTCTimezone)
+        results = yield newcalendar.calendarObjectsInTimeRange(testMin, testMax, Timezone.UTCTimezone)
+        self.assertEqual([result.name() for result in results], ["this-year.ics"])
+
+        testMin = DateTime(nowYear, 1, 1, 0, 0, 0, tzid=Timezone.UTCTimezone)
+        testMax = DateTime(nowYear + 1, 2, 1, 0, 0, 0, tzid=Timezone.UTCTimezone)
+        results = yield newcalendar.calendarObjectsInTimeRange(testMin, testMax, Timezone.UTCTimezone)
+        self.assertEqual(sorted([result.name() for result in results]), ["next-year.ics", "this-year.ics"])
+
+        testMin = DateTime(nowYear, 3, 1, 0, 0, 0, tzid=Timezone.UTCTimezone)
+        testMax = DateTime(nowYear, 4, 1, 0, 0, 0, tzid=Timezone.UTCTimezone)
+        results = yield newcalendar.calendarObjectsInTimeRange(testMin, testMax, Timezone.UTCTimezone)
+        self.assertEqual(results, [])
+
+        # Non-UTC bounds - Etc/GMT+1 is one hour behind UTC
+        TimezoneCache.create()
+        self.addCleanup(TimezoneCache.clear)
+        tz = Timezone(tzid="Etc/GMT+1")
+
+        testMin = DateTime(nowYear, 1, 2, 13, 30, 0, tzid=tz)
+        testMax = DateTime(nowYear, 1, 2, 14, 0, 0, tzid=tz)
+        results = yield newcalendar.calendarObjectsInTimeRange(testMin, testMax, tz)
+        self.assertEqual([result.name() for result in results], ["this-year.ics"])
+
+        testMin = DateTime(nowYear, 1, 2, 14, 15, 0, tzid=tz)
+        testMax = DateTime(nowYear, 1, 2, 14, 45, 0, tzid=tz)
+        results = yield newcalendar.calendarObjectsInTimeRange(testMin, testMax, tz)
+        self.assertEqual(results, [])
+
+    @inlineCallbacks
+    def test_calendarObjectsInTimeRangeLimits(self):
+        """
+        Test Calendar.calendarObjectsInTimeRange rejects time ranges outside of the
+        limits the index can be expanded to.
+        """
+
+        self.patch(config, "FreeBusyIndexLowerLimitDays", 365)
+        self.patch(config, "FreeBusyIndexExpandMaxDays", 5 * 365)
+
+        calendar = yield self.calendarUnderTest()
+        nowYear = self.nowYear["now"]
+
+        testMin = DateTime(nowYear, 1, 1, 0, 0, 0, tzid=Timezone.UTCTimezone)
+        testMax = DateTime(nowYear + 10, 1, 1, 0, 0, 0, tzid=Timezone.UTCTimezone)
+        yield self.failUnlessFailure(
+            calendar.calendarObjectsInTimeRange(testMin, testMax, Timezone.UTCTimezone),
+            TimeRangeUpperLimit,
+        )
+
+        testMin = DateTime(nowYear - 5, 1, 1, 0, 0, 0, tzid=Timezone.UTCTimezone)
+        testMax = DateTime(nowYear, 1, 1, 0, 0, 0, tzid=Timezone.UTCTimezone)
+        yield self.failUnlessFailure(
+            calendar.calendarObjectsInTimeRange(testMin, testMax, Timezone.UTCTimezone),
+            TimeRangeLowerLimit,
+        )
+
     @inlineCallbacks
     def test_notExpandedWithin(self):
         """
@@ -1468,6 +1574,56 @@ END:VCALENDAR
         result = yield newcalendar.notExpandedWithin(testMin, testMax)
         self.assertEqual(result, ["indexing.ics"])
 
+    @inlineCallbacks
+    def test_reCreateIndexOnly(self):
+        """
+        Test that re-creating the index for a calendar object extends the expanded
+        range but does not change the stored calendar data or its modified time.
+        """
+
+        self.patch(config, "FreeBusyIndexDelayedExpand", False)
+
+        home = yield self.homeUnderTest()
+        newcalendar = yield home.createCalendarWithName("reindex_testing")
+
+        nowYear = self.nowYear["now"]
+        caldata = """BEGIN:VCALENDAR
+VERSION:2.0
+CALSCALE:GREGORIAN
+PRODID:-//CALENDARSERVER.ORG//NONSGML Version 1//EN
+BEGIN:VEVENT
+UID:instance
+DTSTART:%04d0102T140000Z
+DURATION:PT1H
+CREATED:20060102T190000Z
+DTSTAMP:20051222T210507Z
+RRULE:FREQ=WEEKLY
+SUMMARY:instance
+END:VEVENT
+END:VCALENDAR
+""".replace("\n", "\r\n") % (nowYear - 3,)
+        calendarObject = yield newcalendar.createCalendarObjectWithName("reindex.ics", Component.fromString(caldata))
+        yield self.commit()
+
+        calendarObject = yield self.calendarObjectUnderTest(name="reindex.ics", calendar_name="reindex_testing")
+        modified = calendarObject.modified()
+        md5 = calendarObject.md5()
+        _ignore_rmin, rmax = yield calendarObject.recurrenceMinMax()
+        self.assertEqual(rmax.getYear(), nowYear + 1)
+
+        yield calendarObject.updateDatabase(
+            (yield calendarObject.component()),
+            expand_until=DateTime(nowYear + 3, 1, 1, 0, 0, 0, tzid=Timezone.UTCTimezone),
+            reCreate=True,
+        )
+        yield self.commit()
+
+        calendarObject = yield self.calendarObjectUnderTest(name="reindex.ics", calendar_name="reindex_testing")
+        self.assertEqual(calendarObject.modified(), modified)
+        self.assertEqual(calendarObject.md5(), md5)
+        _ignore_rmin, rmax = yield calendarObject.recurrenceMinMax()
+        self.assertEqual(rmax.getYear(), nowYear + 3)
+
     @inlineCallbacks
     def test_setComponent_no_instance_indexing(self):
         """
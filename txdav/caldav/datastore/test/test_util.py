@@ -31,7 +31,7 @@ from twistedcaldav.test.util import TestCase
 from txdav.common.datastore.test.util import populateCalendarsFrom, CommonCommonTests
 
 from txdav.caldav.datastore.util import dropboxIDFromCalendarObject, \
-    StorageTransportBase, migrateHome
+    dropboxIDFromUID, StorageTransportBase, migrateHome
 
 from txdav.common.icommondatastore import HomeChildNameAlreadyExistsError
 
@@ -273,6 +273,19 @@ END:VCALENDAR
                 "%s.dropbox" % (result,),
             )
 
+    def test_dropboxIDFromUID(self):
+        test_UIDs = (
+            ("12345/67890", "12345-67890"),
+            ("http://12345,67890", "12345,67890"),
+            ("https://12345,67890", "12345,67890"),
+            ("12345:67890", "1234567890"),
+            ("12345.67890", "1234567890"),
+            ("12345/6:7.890", "12345-67890"),
+        )
+
+        for uid, result in test_UIDs:
+            self.assertEquals(dropboxIDFromUID(uid), "%s.dropbox" % (result,))
+
 
 class StorageTransportTests(TestCase):
 
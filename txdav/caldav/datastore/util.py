@@ -165,7 +165,18 @@ def dropboxIDFromCalendarObject(calendarObject):
                 pass
 
     # Return a "safe" version of the UID
-    uid = calendarObject.uid()
+    returnValue(dropboxIDFromUID(calendarObject.uid()))
+
+
+def dropboxIDFromUID(uid):
+    """
+    Derive the default dropbox ID for a calendar object from its UID. This is
+    the value L{dropboxIDFromCalendarObject} falls back to when the calendar
+    data has no explicit dropbox reference.
+
+    @param uid: the UID of the calendar object
+    @type uid: C{str}
+    """
     if uid.startswith("http://"):
         uid = uid.replace("http://", "")
     if uid.startswith("https://"):
@@ -173,7 +184,7 @@ def dropboxIDFromCalendarObject(calendarObject):
     uid = uid.replace("/", "-")
     uid = uid.replace(":", "")
     uid = uid.replace(".", "")
-    returnValue(uid + ".dropbox")
+    return uid + ".dropbox"
 
 
 @inlineCallbacks
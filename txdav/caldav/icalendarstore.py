@@ -308,6 +308,13 @@ class ICalendar(INotifier, IShareableCollection, IDataStoreObject):
         @return: an iterable of L{ICalendarObject}s.
         """
 
+    def calendarObjectsWithText():  # @NoSelf
+        """
+        Retrieve the calendar objects contained in this calendar, with their data preloaded.
+
+        @return: an iterable of L{ICalendarObject}s.
+        """
+
     def calendarObjectWithName(name):  # @NoSelf
         """
         Retrieve the calendar object with the given C{name} contained
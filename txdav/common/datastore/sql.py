@@ -3664,6 +3664,16 @@ class CommonHomeChild(FancyEqMixin, Memoizable, _SharedSyncLogic, HomeChildBase,
         self._objectNames = sorted([result.name() for result in results])
         returnValue(results)
 
+    @inlineCallbacks
+    def objectResourcesWithText(self):
+        """
+        Load and cache all children, along with their text data - optimization for
+        operations that will go on to read the data of every child.
+        """
+        results = (yield self.objectResources())
+        yield self._objectResourceClass.loadAllText(self, results)
+        returnValue(results)
+
     @inlineCallbacks
     def objectResourcesWithNames(self, names):
         """
@@ -4438,6 +4448,31 @@ class CommonObjectResource(FancyEqMixin, object):
 
         returnValue(results)
 
+    @classproperty
+    def _allTextWithParentQuery(cls):
+        obj = cls._objectSchema
+        return Select([obj.RESOURCE_ID, obj.TEXT], From=obj,
+                      Where=obj.PARENT_RESOURCE_ID == Parameter("parentID"))
+
+    @classmethod
+    @inlineCallbacks
+    def loadAllText(cls, parent, objects):
+        """
+        Load the text data for the supplied child objects of a parent using a single
+        query, rather than one query per object when each one is read.
+
+        @param parent: the parent of the objects
+        @type parent: L{CommonHomeChild}
+        @param objects: child objects of C{parent} to load text data for
+        @type objects: C{list} of L{CommonObjectResource}
+        """
+        objects = [obj for obj in objects if obj._textData is None]
+        if objects:
+            texts = dict((yield cls._allTextWithParentQuery.on(
+                parent._txn, parentID=parent._resourceID)))
+            for obj in objects:
+                obj._textData = texts.get(obj._resourceID)
+
     @classmethod
     @inlineCallbacks
     def loadAllObjectsWithNames(cls, parent, names):
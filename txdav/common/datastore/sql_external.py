@@ -392,6 +392,11 @@ class CommonObjectResourceExternal(CommonObjectResource):
                 results.append(child)
         returnValue(results)
 
+    @classmethod
+    def loadAllText(cls, parent, objects):
+        # Data for external objects is always read via the other pod
+        return succeed(None)
+
     @classmethod
     @inlineCallbacks
     def loadAllObjectsWithNames(cls, parent, names):